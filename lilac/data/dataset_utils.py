@@ -1,12 +1,11 @@
 """Utilities for working with datasets."""
 
+import base64
 import gc
-import itertools
-import json
 import math
 import os
 import pprint
-import secrets
+from collections import deque
 from collections.abc import Iterable
 from functools import partial
 from typing import Any, Callable, Generator, Iterator, Optional, TypeVar, Union, cast
@@ -38,13 +37,21 @@ from ..schema import (
   schema_to_arrow_schema,
 )
 from ..signal import Signal
-from ..utils import chunks, is_primitive, log, open_file
+from ..utils import GCS_PROTOCOL, chunks, is_primitive, log, open_file
 
 # The embedding write chunk sizes keeps the memory pressure lower as we iteratively write to the
 # vector store. Embeddings are float32, taking up 4 bytes, so this results in ~130K * dims of RAM
 # pressure.
 EMBEDDINGS_WRITE_CHUNK_SIZE = 32_768
 
+# Row ids are 12 random bytes, encoded as 16 base64 characters. They are generated in blocks to
+# avoid a syscall for every row.
+_ROWID_NUM_BYTES = 12
+_ROWID_BLOCK_SIZE = 8192
+
+# The number of items converted to arrow and handed to the parquet writer at once.
+PARQUET_WRITE_BATCH_SIZE = 8192
+
 
 def _replace_embeddings_with_none(input: Union[Item, Item]) -> Union[Item, Item]:
   if isinstance(input, np.ndarray):
@@ -67,7 +74,7 @@ def count_leafs(input: Union[Iterable, Iterator]) -> int:
 
   Sum the final set of counts. This is the important iterable not to exhaust.
   """
-  return len(list(flatten_iter(input)))
+  return sum(1 for _ in flatten_iter(input))
 
 
 def _wrap_value_in_dict(input: Union[object, dict], props: PathTuple) -> Union[object, dict]:
@@ -192,7 +199,7 @@ def write_embeddings_to_disk(
     _flat_embeddings(signal_item, path=(signal_item[ROWID],)) for signal_item in signal_items
   )
 
-  def _get_span_vectors() -> Iterator[Item]:
+  def _get_span_vectors() -> Iterator[tuple[PathKey, list[tuple[int, int]], np.ndarray]]:
     for path_item in path_embedding_items:
       for path_key, embedding_items in path_item:
         if not path_key or not embedding_items:
@@ -209,30 +216,48 @@ def write_embeddings_to_disk(
           embedding_vectors.append(vector.reshape(-1))
           spans.append((text_span[TEXT_SPAN_START_FEATURE], text_span[TEXT_SPAN_END_FEATURE]))
 
-        yield (path_key, spans, embedding_vectors)
+        yield (path_key, spans, np.stack(embedding_vectors))
 
   span_vectors = _get_span_vectors()
 
   vector_index = VectorDBIndex(vector_store)
+  # The embedding matrix for each chunk is assembled into a single buffer that is re-used across
+  # chunks. The vector stores copy the embeddings on `add`, so the buffer can be safely overwritten.
+  embedding_buffer: Optional[np.ndarray] = None
   for span_vectors_chunk in chunks(span_vectors, EMBEDDINGS_WRITE_CHUNK_SIZE):
     chunk_spans: list[tuple[PathKey, list[tuple[int, int]]]] = []
     chunk_embedding_vectors: list[np.ndarray] = []
     for path_key, spans, vectors in span_vectors_chunk:
       chunk_spans.append((path_key, spans))
-      chunk_embedding_vectors.extend(vectors)
+      chunk_embedding_vectors.append(vectors)
 
-    embedding_matrix = np.array(chunk_embedding_vectors, dtype=np.float32)
+    num_vectors = sum(len(vectors) for vectors in chunk_embedding_vectors)
+    dim = chunk_embedding_vectors[0].shape[1]
+    if (
+      embedding_buffer is None
+      or embedding_buffer.shape[1] != dim
+      or embedding_buffer.shape[0] < num_vectors
+    ):
+      embedding_buffer = np.empty((num_vectors, dim), dtype=np.float32)
+
+    embedding_matrix = embedding_buffer[:num_vectors]
+    np.concatenate(chunk_embedding_vectors, axis=0, out=embedding_matrix)
 
     vector_index.add(chunk_spans, embedding_matrix)
     vector_index.save(output_dir)
 
-    del embedding_matrix, chunk_embedding_vectors, chunk_spans
-    gc.collect()
-
-  del vector_index
+  del vector_index, embedding_buffer
   gc.collect()
 
 
+def _rowid_factory() -> Iterator[str]:
+  """Yields random url-safe row ids, reading from the OS random source once per block."""
+  while True:
+    buf = os.urandom(_ROWID_BLOCK_SIZE * _ROWID_NUM_BYTES)
+    for i in range(0, len(buf), _ROWID_NUM_BYTES):
+      yield base64.urlsafe_b64encode(buf[i : i + _ROWID_NUM_BYTES]).decode('ascii')
+
+
 def write_items_to_parquet(
   items: Iterable[Item],
   output_dir: str,
@@ -240,70 +265,113 @@ def write_items_to_parquet(
   filename_prefix: str,
   shard_index: int,
   num_shards: int,
+  write_batch_size: int = PARQUET_WRITE_BATCH_SIZE,
+  drop_page_cache: bool = False,
 ) -> str:
-  """Write a set of items to a parquet file, in columnar format."""
-  schema = schema.model_copy(deep=True)
-  # Add a rowid column.
-  schema.fields[ROWID] = Field(dtype=STRING)
+  """Write a set of items to a parquet file, in columnar format.
+
+  When `drop_page_cache` is true, the OS is advised to drop the written file from the page cache so
+  large shards don't evict the rest of the page cache.
+  """
+  # Add a rowid column. Only the top-level fields are copied since the child fields aren't mutated.
+  schema = Schema(fields={**schema.fields, ROWID: Field(dtype=STRING)})
 
   arrow_schema = schema_to_arrow_schema(schema)
   out_filename = get_parquet_filename(filename_prefix, shard_index, num_shards)
   filepath = os.path.join(output_dir, out_filename)
   f = open_file(filepath, mode='wb')
-  writer = ParquetWriter(schema)
+  writer = ParquetWriter(arrow_schema)
   writer.open(f)
   debug = env('DEBUG', False)
-  num_items = 0
-  for item in items:
-    # Add a rowid column.
-    if ROWID not in item:
-      item[ROWID] = secrets.token_urlsafe(nbytes=12)  # 16 base64 characters.
-    if debug:
-      try:
-        _validate(item, arrow_schema)
-      except Exception as e:
-        raise ValueError(f'Error validating item: {json.dumps(item)}') from e
-    writer.write(item)
-    num_items += 1
+  rowids = _rowid_factory()
+  for batch in chunks(items, write_batch_size):
+    for item in batch:
+      # Add a rowid column.
+      if ROWID not in item:
+        item[ROWID] = next(rowids)
+    _write_batch(writer, batch, arrow_schema, debug)
   writer.close()
   f.close()
+  if drop_page_cache:
+    _drop_from_page_cache(filepath)
   return out_filename
 
 
-def _validate(item: Item, schema: pa.Schema) -> None:
-  # Try to parse the item using the inferred schema.
+def _drop_from_page_cache(filepath: str) -> None:
+  """Advise the OS to drop a local file from the page cache, where supported."""
+  if filepath.startswith(GCS_PROTOCOL) or not hasattr(os, 'posix_fadvise'):
+    return
+  fd = os.open(filepath, os.O_RDONLY)
   try:
-    pa.RecordBatch.from_pylist([item], schema=schema)
-  except pa.ArrowTypeError:
-    log('Failed to parse arrow item using the arrow schema.')
-    log('Item:')
-    log(pprint.pformat(item, indent=2))
-    log('Arrow schema:')
-    log(schema)
+    # Only clean pages are dropped, so flush the freshly written pages to disk first.
+    os.fdatasync(fd)
+    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+  finally:
+    os.close(fd)
+
+
+def _write_batch(writer: ParquetWriter, batch: list[Item], schema: pa.Schema, debug: bool) -> None:
+  # Converting the batch to arrow validates every item against the schema.
+  try:
+    writer.write_batch(batch)
+  except (pa.ArrowTypeError, pa.ArrowInvalid):
+    if debug:
+      _log_invalid_item(_find_invalid_item(batch, schema), schema)
     raise  # Re-raise the same exception, same stacktrace.
 
 
+def _find_invalid_item(batch: list[Item], schema: pa.Schema) -> Item:
+  """Bisect the batch to find the first item that fails to convert to arrow."""
+  while len(batch) > 1:
+    half = len(batch) // 2
+    try:
+      pa.RecordBatch.from_pylist(batch[:half], schema=schema)
+      batch = batch[half:]
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+      batch = batch[:half]
+  return batch[0]
+
+
+def _log_invalid_item(item: Item, schema: pa.Schema) -> None:
+  log('Failed to parse arrow item using the arrow schema.')
+  log('Item:')
+  log(pprint.pformat(item, indent=2))
+  log('Arrow schema:')
+  log(schema)
+
+
 def get_parquet_filename(prefix: str, shard_index: int, num_shards: int) -> str:
   """Return the filename for a parquet file."""
   return f'{prefix}-{shard_index:05d}-of-{num_shards:05d}.parquet'
 
 
+# Types that are always leafs when flattening keys, regardless of the primitive predicate.
+_FLATTEN_KEYS_LEAF_TYPES = frozenset({str, bytes, int, float, bool, type(None), dict, np.ndarray})
+
+
 def _flatten_keys(
   rowid: str,
   nested_input: Iterable[Any],
   location: list[int],
   is_primitive_predicate: Callable[[object], bool],
 ) -> Iterator[VectorKey]:
-  if (
-    is_primitive_predicate(nested_input)
-    or is_primitive(nested_input)
-    or isinstance(nested_input, dict)
-  ):
-    yield (rowid, *location)
-    return
+  # Lists are never primitive for the default predicate, so we can skip calling it.
+  is_default_predicate = is_primitive_predicate is is_primitive
+  stack: deque[tuple[Any, tuple[int, ...]]] = deque([(nested_input, tuple(location))])
+  while stack:
+    value, value_location = stack.pop()
+    value_type = type(value)
+    if value_type in _FLATTEN_KEYS_LEAF_TYPES or (
+      not (value_type is list and is_default_predicate)
+      and (is_primitive_predicate(value) or is_primitive(value) or isinstance(value, dict))
+    ):
+      yield (rowid, *value_location)
+      continue
 
-  for i, input in enumerate(nested_input):
-    yield from _flatten_keys(rowid, input, [*location, i], is_primitive_predicate)
+    children = value if value_type is list else list(value)
+    # Push in reverse so elements are visited in order.
+    for i in range(len(children) - 1, -1, -1):
+      stack.append((children[i], (*value_location, i)))
 
 
 def flatten_keys(
@@ -328,14 +396,43 @@ def sparse_to_dense_compute(
 ) -> Iterator[Optional[Tout]]:
   """Densifies the input before calling the provided `func` and sparsifies the output."""
   sparse_input = iter(sparse_input)
-  sparse_input, sparse_input_2 = itertools.tee(sparse_input, 2)
-  dense_input = cast(Iterator[Tin], filter(lambda x: x is not None, sparse_input_2))
-  dense_output = iter(func(dense_input))
-  for input in sparse_input:
-    if input is None:
+  # The positions of the non-None inputs that have been handed to `func` but not yet yielded. This
+  # only holds the items in flight, instead of buffering the whole input like `itertools.tee`.
+  dense_positions: deque[int] = deque()
+  num_inputs = 0
+
+  def _dense_input() -> Iterator[Tin]:
+    nonlocal num_inputs
+    for input in sparse_input:
+      position = num_inputs
+      num_inputs += 1
+      if input is not None:
+        dense_positions.append(position)
+        yield input
+
+  dense_output = iter(func(_dense_input()))
+  position = 0
+  for output in dense_output:
+    if not dense_positions:
+      # `func` returned more outputs than it was given inputs.
+      break
+    dense_position = dense_positions.popleft()
+    while position < dense_position:
       yield None
-    else:
-      yield next(dense_output)
+      position += 1
+    yield output
+    position += 1
+
+  if dense_positions:
+    raise RuntimeError('func returned fewer outputs than inputs')
+  # Trailing missing values.
+  while position < num_inputs:
+    yield None
+    position += 1
+  for input in sparse_input:
+    if input is not None:
+      raise RuntimeError('func returned fewer outputs than inputs')
+    yield None
 
 
 def shard_id_to_range(
@@ -1,10 +1,27 @@
 """Tests for dataset utils."""
 
+import os
+import pathlib
 from typing import Iterable, Iterator
 
-from ..schema import PathTuple
+import numpy as np
+import pyarrow as pa
+import pytest
+from pytest_mock import MockerFixture
+
+from ..schema import PathTuple, schema
 from ..utils import chunks
-from .dataset_utils import count_leafs, sparse_to_dense_compute, wrap_in_dicts
+from . import dataset_utils
+from .dataset_utils import (
+  _find_invalid_item,
+  count_leafs,
+  get_sibling_output_path,
+  paths_have_same_cardinality,
+  replace_embeddings_with_none,
+  sparse_to_dense_compute,
+  wrap_in_dicts,
+  write_items_to_parquet,
+)
 
 
 def test_count_nested() -> None:
@@ -12,6 +29,22 @@ def test_count_nested() -> None:
   assert 6 == count_leafs(a)
 
 
+def test_replace_embeddings_with_none() -> None:
+  item = {
+    'text': 'hello',
+    'embeddings': [{'span': [0, 5], 'embedding': np.array([1.0, 2.0])}],
+    'nested': [[np.array([3.0])], None],
+  }
+  assert replace_embeddings_with_none(item) == {
+    'text': 'hello',
+    'embeddings': [{'span': [0, 5], 'embedding': None}],
+    'nested': [[None], None],
+  }
+  # The input is not mutated.
+  assert item['nested'][0][0] is not None
+  assert replace_embeddings_with_none(np.array([1.0])) is None
+
+
 def test_wrap_in_dicts_with_spec_of_one_repeated() -> None:
   a = [[1, 2], [3], [4, 5, 5]]
   spec: list[PathTuple] = [('a', 'b', 'c'), ('d',)]  # Corresponds to a.b.c.*.d.
@@ -101,3 +134,62 @@ def test_sparse_to_dense_compute_iterable_returned() -> None:
 
   out = sparse_to_dense_compute(sparse_input, func)
   assert list(out) == [2, 3, 4]
+
+
+def test_paths_have_same_cardinality() -> None:
+  assert paths_have_same_cardinality(('a', 'b'), ('c',))
+  assert paths_have_same_cardinality(('a', '*', 'b'), ('a', '*', 'c', 'd'))
+  assert not paths_have_same_cardinality(('a', '*', 'b'), ('a', 'b'))
+  assert not paths_have_same_cardinality(('a', '*', 'b', '*'), ('a', '*', 'b'))
+
+
+def test_get_sibling_output_path() -> None:
+  assert get_sibling_output_path(('a', 'b'), 'cluster') == ('a', 'b_cluster')
+  assert get_sibling_output_path(('a', '*'), 'cluster') == ('a_cluster', '*')
+  assert get_sibling_output_path(('a', '*', 'b', '*', '*'), 'x') == ('a', '*', 'b_x', '*', '*')
+
+
+def test_sparse_to_dense_compute_fewer_outputs() -> None:
+  sparse_input = iter([None, 1, None, 2, None])
+
+  def func(xs: Iterable[int]) -> Iterator[int]:
+    for x in xs:
+      if x == 1:
+        yield x + 1
+
+  with pytest.raises(RuntimeError, match='fewer outputs than inputs'):
+    list(sparse_to_dense_compute(sparse_input, func))
+
+
+def test_sparse_to_dense_compute_stops_consuming_input() -> None:
+  sparse_input = iter([None, 1, None, 2, None])
+
+  def func(xs: Iterable[int]) -> Iterator[int]:
+    yield next(iter(xs)) + 1
+
+  with pytest.raises(RuntimeError, match='fewer outputs than inputs'):
+    list(sparse_to_dense_compute(sparse_input, func))
+
+
+def test_find_invalid_item() -> None:
+  arrow_schema = pa.schema({'num': pa.int32()})
+  items: list[dict] = [{'num': i} for i in range(1000)]
+  items[345] = {'num': 'not a number'}
+  assert _find_invalid_item(items, arrow_schema) is items[345]
+
+
+def test_write_items_to_parquet_invalid_item_debug(
+  tmp_path: pathlib.Path, mocker: MockerFixture
+) -> None:
+  mocker.patch.dict(os.environ, {'DEBUG': 'true'})
+  log_mock = mocker.patch.object(dataset_utils, 'log')
+  items: list[dict] = [{'num': i} for i in range(100)]
+  items[42] = {'num': 'not a number'}
+
+  with pytest.raises((pa.ArrowTypeError, pa.ArrowInvalid)):
+    write_items_to_parquet(
+      items, str(tmp_path), schema({'num': 'int32'}), 'data', 0, 1, write_batch_size=64
+    )
+
+  logged = '\n'.join(str(call.args[0]) for call in log_mock.call_args_list)
+  assert "'num': 'not a number'" in logged
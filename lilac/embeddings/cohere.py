@@ -1,5 +1,7 @@
 """Cohere embeddings."""
-from typing import TYPE_CHECKING, ClassVar, Optional
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Any, ClassVar, Coroutine, Iterator, Optional, TypeVar
 
 import numpy as np
 from typing_extensions import override
@@ -7,14 +9,70 @@ from typing_extensions import override
 from ..env import env
 from ..schema import Item
 from ..signal import TextEmbeddingSignal
-from ..splitters.spacy_splitter import clustering_spacy_chunker
+from ..splitters.spacy_splitter import clustering_spacy_batch_chunker
 from ..tasks import TaskExecutionType
 from .embedding import chunked_compute_embedding
 
 if TYPE_CHECKING:
-  from cohere import Client
+  from cohere import AsyncClient
 
 COHERE_EMBED_MODEL = 'embed-english-light-v3.0'
+# The maximum number of texts the Cohere embed API accepts in a single request.
+COHERE_BATCH_SIZE = 96
+COHERE_NUM_PARALLEL_REQUESTS = 10
+# The maximum total number of characters, as a proxy for tokens, sent in a single request. This
+# keeps large chunks from producing oversized requests that get rate-limited and retried.
+COHERE_MAX_BATCH_CHARS = 16_000
+
+T = TypeVar('T')
+
+# A single event loop, running on a background thread, owns the async clients. They are shared by
+# all instances of the signal since callers of `setup` don't always call `teardown`. The clients
+# live for the lifetime of the process and their HTTP sessions are never explicitly closed.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_clients: dict[str, 'AsyncClient'] = {}
+_clients_lock = threading.Lock()
+
+
+def _run(coroutine: Coroutine[Any, Any, T]) -> T:
+  """Run a coroutine on the shared event loop and wait for the result."""
+  if _loop is None:
+    raise ValueError('The event loop is not running. Call _get_client() first.')
+  return asyncio.run_coroutine_threadsafe(coroutine, _loop).result()
+
+
+def _get_client(api_key: str) -> 'AsyncClient':
+  """Return the shared async client for the api key, starting the event loop on first use."""
+  global _loop
+  import cohere
+
+  async def _create_client() -> 'AsyncClient':
+    return cohere.AsyncClient(api_key, max_retries=10)
+
+  with _clients_lock:
+    if _loop is None:
+      _loop = asyncio.new_event_loop()
+      threading.Thread(target=_loop.run_forever, daemon=True).start()
+    if api_key not in _clients:
+      _clients[api_key] = _run(_create_client())
+    return _clients[api_key]
+
+
+def _pack_batches(texts: list[str]) -> Iterator[list[str]]:
+  """Greedily pack texts into batches that respect the request size limits."""
+  batch: list[str] = []
+  batch_chars = 0
+  for text in texts:
+    if batch and (
+      len(batch) >= COHERE_BATCH_SIZE or batch_chars + len(text) > COHERE_MAX_BATCH_CHARS
+    ):
+      yield batch
+      batch = []
+      batch_chars = 0
+    batch.append(text)
+    batch_chars += len(text)
+  if batch:
+    yield batch
 
 
 class Cohere(TextEmbeddingSignal):
@@ -30,11 +88,13 @@ class Cohere(TextEmbeddingSignal):
 
   name: ClassVar[str] = 'cohere'
   display_name: ClassVar[str] = 'Cohere Embeddings'
-  map_batch_size: ClassVar[int] = 96
-  map_parallelism: ClassVar[int] = 10
+  # Requests are issued concurrently from a single event loop, so each call to `compute` gets
+  # enough documents to fill all the parallel requests.
+  map_batch_size: ClassVar[int] = COHERE_BATCH_SIZE * COHERE_NUM_PARALLEL_REQUESTS
+  map_parallelism: ClassVar[int] = 1
   map_strategy: ClassVar[TaskExecutionType] = 'threads'
 
-  _model: 'Client'
+  _model: Optional['AsyncClient'] = None
 
   @override
   def setup(self) -> None:
@@ -43,25 +103,44 @@ class Cohere(TextEmbeddingSignal):
     if not api_key:
       raise ValueError('`COHERE_API_KEY` environment variable not set.')
     try:
-      import cohere
-
-      self._model = cohere.Client(api_key, max_retries=10)
+      import cohere  # noqa: F401
     except ImportError:
       raise ImportError(
         'Could not import the "cohere" python package. '
         'Please install it with `pip install cohere`.'
       )
+    self._model = _get_client(api_key)
 
   @override
   def compute(self, docs: list[str]) -> list[Optional[Item]]:
     """Compute embeddings for the given documents."""
+    if self._model is None:
+      raise ValueError('The signal is not initialized. Call setup() first.')
+    model = self._model
     cohere_input_type = 'search_document' if self.embed_input_type == 'document' else 'search_query'
 
-    def _embed_fn(docs: list[str]) -> list[np.ndarray]:
-      return self._model.embed(
-        docs, truncate='END', model=COHERE_EMBED_MODEL, input_type=cohere_input_type
-      ).embeddings
+    async def _embed_batches(texts: list[str]) -> np.ndarray:
+      semaphore = asyncio.Semaphore(COHERE_NUM_PARALLEL_REQUESTS)
+
+      async def _embed_batch(batch: list[str]) -> list[list[float]]:
+        async with semaphore:
+          response = await model.embed(
+            texts=batch, truncate='END', model=COHERE_EMBED_MODEL, input_type=cohere_input_type
+          )
+          return response.embeddings
+
+      batch_embeddings = await asyncio.gather(
+        *[_embed_batch(batch) for batch in _pack_batches(texts)]
+      )
+      return np.array(
+        [embedding for embeddings in batch_embeddings for embedding in embeddings], dtype=np.float32
+      )
+
+    def _embed_fn(texts: list[str]) -> np.ndarray:
+      return _run(_embed_batches(texts))
 
+    # The chunker expands each document into several chunks. We hand all of them to `_embed_fn` at
+    # once so the API requests can be issued concurrently.
     return chunked_compute_embedding(
-      _embed_fn, docs, self.map_batch_size, chunker=clustering_spacy_chunker
+      _embed_fn, docs, self.map_batch_size * 16, batch_chunker=clustering_spacy_batch_chunker
     )
@@ -0,0 +1,61 @@
+"""Tests for cohere.py."""
+
+import os
+import sys
+import threading
+import types
+from typing import Iterator
+
+import pytest
+from pytest_mock import MockerFixture
+
+from . import cohere
+from .cohere import COHERE_BATCH_SIZE, COHERE_MAX_BATCH_CHARS, Cohere, _pack_batches
+
+
+@pytest.fixture
+def shared_client_state(mocker: MockerFixture) -> Iterator[None]:
+  """Isolate the shared clients and event loop, stopping the loop after the test."""
+  mocker.patch.object(cohere, '_clients', {})
+  mocker.patch.object(cohere, '_loop', None)
+  yield
+  if cohere._loop is not None:
+    cohere._loop.call_soon_threadsafe(cohere._loop.stop)
+
+
+@pytest.mark.usefixtures('shared_client_state')
+def test_setup_shares_client_and_event_loop(mocker: MockerFixture) -> None:
+  cohere_stub = types.ModuleType('cohere')
+  cohere_stub.AsyncClient = mocker.MagicMock  # type: ignore
+  mocker.patch.dict(sys.modules, {'cohere': cohere_stub})
+  mocker.patch.dict(os.environ, {'COHERE_API_KEY': 'test-key'})
+
+  signal = Cohere()
+  signal.setup()
+  num_threads = threading.active_count()
+
+  for _ in range(5):
+    other_signal = Cohere()
+    other_signal.setup()
+    assert other_signal._model is signal._model
+
+  assert threading.active_count() == num_threads
+
+
+def test_pack_batches_max_batch_size() -> None:
+  texts = ['a'] * (COHERE_BATCH_SIZE + 1)
+  assert [len(batch) for batch in _pack_batches(texts)] == [COHERE_BATCH_SIZE, 1]
+
+
+def test_pack_batches_max_chars() -> None:
+  half = 'a' * (COHERE_MAX_BATCH_CHARS // 2)
+  assert list(_pack_batches([half, half, 'b'])) == [[half, half], ['b']]
+
+
+def test_pack_batches_long_text_gets_own_batch() -> None:
+  long_text = 'a' * (COHERE_MAX_BATCH_CHARS + 1)
+  assert list(_pack_batches(['b', long_text, 'c'])) == [['b'], [long_text], ['c']]
+
+
+def test_pack_batches_empty() -> None:
+  assert list(_pack_batches([])) == []
@@ -33,6 +33,10 @@ EmbeddingId = Union[StrictStr, TextEmbeddingSignal]
 
 EmbedFn = Callable[[Iterable[RichData]], Iterable[list[SpanVector]]]
 
+# Embeds a batch of texts. Returning a single 2D matrix is preferred over a list of vectors, since
+# each embedding is then a view into one contiguous buffer instead of a separate allocation.
+EmbedBatchFn = Callable[[list[str]], Union[np.ndarray, list[np.ndarray]]]
+
 
 def get_embed_fn(
   embedding_name: str, split: bool, input_type: EmbeddingInputType = 'document'
@@ -69,18 +73,26 @@ def identity_chunker(doc: str) -> list[TextChunk]:
 
 
 def chunked_compute_embedding(
-  embed_fn: Callable[[list[str]], list[np.ndarray]],
+  embed_fn: EmbedBatchFn,
   docs: list[str],
   batch_size: int,
   chunker: Callable[[str], list[TextChunk]] = identity_chunker,
+  batch_chunker: Optional[Callable[[list[str]], list[list[TextChunk]]]] = None,
 ) -> list[Optional[list[Item]]]:
-  """Compute text embeddings for chunks of text, using the provided splitter and embedding fn."""
-  text_chunks = [(i, chunk) for i, doc in enumerate(docs) for chunk in chunker(doc)]
+  """Compute text embeddings for chunks of text, using the provided splitter and embedding fn.
+
+  When `batch_chunker` is provided, it splits all the documents at once instead of `chunker`.
+  """
+  doc_chunks = batch_chunker(docs) if batch_chunker else [chunker(doc) for doc in docs]
+  text_chunks = [
+    (i, chunk) for i, doc_text_chunks in enumerate(doc_chunks) for chunk in doc_text_chunks
+  ]
   output: list[list[Item]] = [[] for _ in docs]
   batches = chunks(text_chunks, batch_size)
   for batch in batches:
     batch_texts = [text for _, (text, _) in batch]
     batch_embeddings = embed_fn(batch_texts)
+    # When `embed_fn` returns a matrix, iterating it yields row views that share its buffer.
     for (i, (_, (start, end))), embedding in zip(batch, batch_embeddings):
       output[i].append(lilac_embedding(start, end, embedding))
 
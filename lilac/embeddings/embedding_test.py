@@ -105,3 +105,21 @@ def test_split_and_combine_text_embeddings_empty_docs_at_end() -> None:
     None,
     None,
   ]
+
+
+def test_split_and_combine_text_embeddings_matrix_output() -> None:
+  docs = ['ab', 'c']
+  batch_size = 2
+
+  def embed_fn(batch: list[str]) -> np.ndarray:
+    return np.array([[ord(text)] for text in batch], dtype=np.float32)
+
+  result = list(chunked_compute_embedding(embed_fn, docs, batch_size, char_splitter))
+
+  assert result == [
+    [
+      lilac_embedding(0, 1, np.array([ord('a')], dtype=np.float32)),
+      lilac_embedding(1, 2, np.array([ord('b')], dtype=np.float32)),
+    ],
+    [lilac_embedding(0, 1, np.array([ord('c')], dtype=np.float32))],
+  ]
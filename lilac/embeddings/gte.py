@@ -9,7 +9,7 @@ if TYPE_CHECKING:
 
 from ..schema import Item
 from ..signal import TextEmbeddingSignal
-from ..splitters.spacy_splitter import clustering_spacy_chunker
+from ..splitters.spacy_splitter import clustering_spacy_batch_chunker
 from ..tasks import TaskExecutionType
 from .embedding import chunked_compute_embedding
 from .transformer_utils import SENTENCE_TRANSFORMER_BATCH_SIZE, setup_model_device
@@ -54,7 +54,10 @@ class GTESmall(TextEmbeddingSignal):
     # The sentence transformer API actually does batching internally, so we pass map_batch_size * 16
     # to allow the library to see all the chunks at once.
     return chunked_compute_embedding(
-      self._model.encode, docs, self.map_batch_size * 16, chunker=clustering_spacy_chunker
+      self._model.encode,
+      docs,
+      self.map_batch_size * 16,
+      batch_chunker=clustering_spacy_batch_chunker,
     )
 
   @override
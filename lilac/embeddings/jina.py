@@ -1,6 +1,7 @@
 """Jina embeddings. Open-source, designed to run on device, with 8K context."""
+import contextlib
 import gc
-from typing import TYPE_CHECKING, Any, ClassVar, Optional, cast
+from typing import TYPE_CHECKING, Any, ClassVar, ContextManager, Iterator, Optional, cast
 
 from ..embeddings.embedding import chunked_compute_embedding
 from ..tasks import TaskExecutionType
@@ -10,7 +11,6 @@ if TYPE_CHECKING:
   from transformers import AutoModel
 
 import numpy as np
-from numpy.linalg import norm
 from typing_extensions import override
 
 from ..schema import Item
@@ -22,10 +22,33 @@ _SIZE_TO_MODEL: dict[str, str] = {
   'base': 'jina-embeddings-v2-base-en',
 }
 
-# Anything larger than 1 slows down the computation because a single long document will cause
-# padding to be added to all other documents in the batch.
-JINA_BATCH_SIZE = 1
+# The number of documents passed to a single `compute` call. Documents are bucketed by length before
+# being encoded, so a larger batch gives more opportunities to group documents of similar length.
+JINA_BATCH_SIZE = 256
 JINA_CONTEXT_SIZE = 8192
+# The maximum number of documents passed to a single `encode` call.
+JINA_MAX_ENCODE_BATCH_SIZE = 32
+# A single long document causes padding to be added to all other documents in the batch, so we only
+# batch documents whose lengths are within this ratio of each other.
+JINA_MAX_LENGTH_RATIO = 1.25
+
+
+def _length_buckets(lengths: list[int]) -> Iterator[list[int]]:
+  """Group indices into batches of similar length, in order of increasing length."""
+  bucket: list[int] = []
+  min_len = 0
+  for i in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+    if bucket and (
+      len(bucket) >= JINA_MAX_ENCODE_BATCH_SIZE
+      or lengths[i] > max(min_len, 1) * JINA_MAX_LENGTH_RATIO
+    ):
+      yield bucket
+      bucket = []
+    if not bucket:
+      min_len = lengths[i]
+    bucket.append(i)
+  if bucket:
+    yield bucket
 
 
 class JinaV2Small(TextEmbeddingSignal):
@@ -58,6 +81,21 @@ class JinaV2Small(TextEmbeddingSignal):
     self._model = setup_model_device(
       AutoModel.from_pretrained(model_name, trust_remote_code=True), model_name
     )
+    if self._model.device.type == 'cuda':
+      import torch
+
+      # `encode` calls the forward pass, so we compile that to fuse kernels. Shapes are dynamic
+      # since the sequence length depends on the documents in each batch.
+      self._model.forward = torch.compile(self._model.forward, dynamic=True)
+
+  def _encode_context(self) -> ContextManager:
+    """Returns the context to run the model in. On CUDA the model runs in half precision."""
+    if self._model is None or self._model.device.type != 'cuda':
+      return contextlib.nullcontext()
+    import torch
+
+    dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    return torch.autocast(device_type='cuda', dtype=dtype)
 
   @override
   def teardown(self) -> None:
@@ -79,16 +117,22 @@ class JinaV2Small(TextEmbeddingSignal):
     if self._model is None:
       raise ValueError('The signal is not initialized. Call setup() first.')
 
-    # SentenceTransformers can take arbitrarily large batches.
-    def _embed_fn(docs: list[str]) -> list[np.ndarray]:
+    def _embed_fn(docs: list[str]) -> np.ndarray:
       trimmed_docs = [doc[:JINA_CONTEXT_SIZE] for doc in docs]
-      vectors = cast(Any, self._model).encode(trimmed_docs)
-      embeddings = []
-      for vector in vectors:
-        vector = np.array(vector)
-        vector /= norm(vector)
-        embeddings.append(vector)
-      return embeddings
+      vectors: list[Any] = [None] * len(trimmed_docs)
+      with self._encode_context():
+        for bucket in _length_buckets([len(doc) for doc in trimmed_docs]):
+          bucket_vectors = cast(Any, self._model).encode(
+            [trimmed_docs[i] for i in bucket], batch_size=len(bucket)
+          )
+          for i, vector in zip(bucket, bucket_vectors):
+            vectors[i] = vector
+
+      # Normalize all the vectors at once, in float32 for numerical stability. Zero vectors are left
+      # as is to avoid dividing by zero.
+      matrix = np.asarray(vectors, dtype=np.float32)
+      matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+      return matrix
 
     return chunked_compute_embedding(
       _embed_fn,
@@ -0,0 +1,26 @@
+"""Tests for jina.py."""
+
+from .jina import JINA_MAX_ENCODE_BATCH_SIZE, _length_buckets
+
+
+def test_length_buckets_sorted_by_length() -> None:
+  assert list(_length_buckets([10, 1, 11])) == [[1], [0, 2]]
+
+
+def test_length_buckets_length_ratio() -> None:
+  # 12 is within 1.25x of 10, 13 is not.
+  assert list(_length_buckets([10, 12, 13])) == [[0, 1], [2]]
+
+
+def test_length_buckets_empty_docs() -> None:
+  # Empty docs are bucketed as if they had length 1.
+  assert list(_length_buckets([0, 0, 1, 2])) == [[0, 1, 2], [3]]
+
+
+def test_length_buckets_max_batch_size() -> None:
+  lengths = [5] * (JINA_MAX_ENCODE_BATCH_SIZE + 1)
+  assert [len(bucket) for bucket in _length_buckets(lengths)] == [JINA_MAX_ENCODE_BATCH_SIZE, 1]
+
+
+def test_length_buckets_empty() -> None:
+  assert list(_length_buckets([])) == []
@@ -8,7 +8,7 @@ from typing_extensions import override
 from ..env import env
 from ..schema import Item
 from ..signal import TextEmbeddingSignal
-from ..splitters.spacy_splitter import clustering_spacy_chunker
+from ..splitters.spacy_splitter import clustering_spacy_batch_chunker
 from ..tasks import TaskExecutionType
 from .embedding import chunked_compute_embedding
 
@@ -93,5 +93,5 @@ class OpenAIEmbedding(TextEmbeddingSignal):
       return [np.array(embedding['embedding'], dtype=np.float32) for embedding in response['data']]
 
     return chunked_compute_embedding(
-      embed_fn, docs, self.map_batch_size, chunker=clustering_spacy_chunker
+      embed_fn, docs, self.map_batch_size, batch_chunker=clustering_spacy_batch_chunker
     )
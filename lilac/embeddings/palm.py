@@ -8,7 +8,7 @@ from typing_extensions import override
 from ..env import env
 from ..schema import Item
 from ..signal import TextEmbeddingSignal
-from ..splitters.spacy_splitter import clustering_spacy_chunker
+from ..splitters.spacy_splitter import clustering_spacy_batch_chunker
 from ..tasks import TaskExecutionType
 from .embedding import chunked_compute_embedding
 
@@ -92,5 +92,5 @@ class PaLM(TextEmbeddingSignal):
         return [np.array(response, dtype=np.float32)]
 
     return chunked_compute_embedding(
-      embed_fn, docs, self.map_batch_size, chunker=clustering_spacy_chunker
+      embed_fn, docs, self.map_batch_size, batch_chunker=clustering_spacy_batch_chunker
     )
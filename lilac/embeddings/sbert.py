@@ -11,7 +11,7 @@ import gc
 
 from ..schema import Item
 from ..signal import TextEmbeddingSignal
-from ..splitters.spacy_splitter import clustering_spacy_chunker
+from ..splitters.spacy_splitter import clustering_spacy_batch_chunker
 from .embedding import chunked_compute_embedding
 from .transformer_utils import SENTENCE_TRANSFORMER_BATCH_SIZE, setup_model_device
 
@@ -48,7 +48,10 @@ class SBERT(TextEmbeddingSignal):
     # The sentence transformer API actually does batching internally, so we pass map_batch_size * 16
     # to allow the library to see all the chunks at once.
     return chunked_compute_embedding(
-      self._model.encode, docs, self.map_batch_size * 16, chunker=clustering_spacy_chunker
+      self._model.encode,
+      docs,
+      self.map_batch_size * 16,
+      batch_chunker=clustering_spacy_batch_chunker,
     )
 
   @override
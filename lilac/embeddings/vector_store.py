@@ -38,6 +38,9 @@ class VectorStore(abc.ABC):
 
     If the keys already exist they will be overwritten, acting as an "upsert".
 
+    Implementations should copy the embeddings and not keep a reference to the matrix, since callers
+    may re-use the same buffer across calls.
+
     Args:
       keys: The keys to add the embeddings for.
       embeddings: The embeddings to add. This should be a 2D matrix with the same length as keys.
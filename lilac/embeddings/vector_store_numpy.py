@@ -57,7 +57,8 @@ class NumpyVectorStore(VectorStore):
     if self._embeddings is None:
       self._embeddings = embeddings.astype(np.float32)
     else:
-      self._embeddings = np.concatenate([self._embeddings, embeddings.astype(np.float32)], axis=0)
+      # Cast while concatenating so the new embeddings are only copied once.
+      self._embeddings = np.concatenate([self._embeddings, embeddings], axis=0, dtype=np.float32)
 
     row_indices = np.arange(current_size, current_size + len(keys), dtype=np.int32)
     new_key_to_label = pd.Series(row_indices, index=keys, dtype=np.int32)
@@ -1,5 +1,5 @@
 """A Parquet file writer that wraps the pyarrow writer."""
-from typing import IO, Optional
+from typing import IO, Optional, Union
 
 import pyarrow as pa
 import pyarrow.parquet as pq
@@ -12,12 +12,12 @@ class ParquetWriter:
 
   def __init__(
     self,
-    schema: Schema,
+    schema: Union[Schema, pa.Schema],
     codec: str = 'snappy',
     row_group_buffer_size: int = 128 * 1024 * 1024,
     record_batch_size: int = 10_000,
   ):
-    self._schema = schema_to_arrow_schema(schema)
+    self._schema = schema if isinstance(schema, pa.Schema) else schema_to_arrow_schema(schema)
     self._codec = codec
     self._row_group_buffer_size = row_group_buffer_size
     self._buffer: list[list[Optional[Item]]] = [[] for _ in range(len(self._schema.names))]
@@ -42,6 +42,22 @@ class ParquetWriter:
     for i, n in enumerate(self._schema.names):
       self._buffer[i].append(record.get(n))
 
+  def write_batch(self, records: list[Item]) -> None:
+    """Write a batch of records to the destination file.
+
+    The whole batch is converted to arrow at once, which is much faster than writing record by
+    record.
+    """
+    if len(self._buffer[0]) > 0:
+      self._flush_buffer()
+
+    if self._record_batches_byte_size >= self._row_group_buffer_size:
+      self._write_batches()
+
+    rb = pa.RecordBatch.from_pylist(records, schema=self._schema)
+    self._record_batches.append(rb)
+    self._record_batches_byte_size = self._record_batches_byte_size + rb.nbytes
+
   def close(self) -> None:
     """Flushes the write buffer and closes the destination file."""
     if len(self._buffer[0]) > 0:
@@ -13,6 +13,8 @@ if TYPE_CHECKING:
 
 # Vector size to use for chunk comparisons.
 BOW_VECTOR_SIZE = 128
+# The number of texts SpaCy processes at once when sentencizing a batch of texts.
+SPACY_PIPE_BATCH_SIZE = 32
 
 
 @functools.cache
@@ -51,15 +53,16 @@ def get_spacy() -> 'spacy.Language':
   return sentencizer
 
 
+def _sentence_chunks(doc: 'spacy.tokens.Doc', text: str, filter_short: int) -> list[TextChunk]:
+  chunks = [(text[s.start_char : s.end_char], (s.start_char, s.end_char)) for s in doc.sents]
+  # Filter out stray whitespace, list numberings, etc.
+  return [c for c in chunks if len(c[0].strip()) > filter_short]
+
+
 def simple_spacy_chunker(text: str, filter_short: int = 4) -> list[TextChunk]:
   """Split text into sentence-based chunks, using SpaCy."""
   sentencizer = get_spacy()
-  chunks = [
-    (text[s.start_char : s.end_char], (s.start_char, s.end_char)) for s in sentencizer(text).sents
-  ]
-  # Filter out stray whitespace, list numberings, etc.
-  chunks = [c for c in chunks if len(c[0].strip()) > filter_short]
-  return chunks
+  return _sentence_chunks(sentencizer(text), text, filter_short)
 
 
 def group_by_embedding(
@@ -114,15 +117,37 @@ def group_by_embedding(
   ]
 
 
-def clustering_spacy_chunker(
-  text: str, filter_short: int = 4, max_len: int = 512, target_num_groups: Optional[int] = None
+def _cluster_sentence_chunks(
+  text: str, chunks: list[TextChunk], max_len: int, target_num_groups: Optional[int]
 ) -> list[TextChunk]:
-  """Split text into sentence-based chunks, with semantic clustering to join related sentences."""
-  chunks = simple_spacy_chunker(text, filter_short=filter_short)
-
   if target_num_groups is None:
     # A rough heuristic for picking a number of target chunks.
     # These magic numbers were chosen by manually chunking 40 texts spanning 50-5000 characters in
     # length, and eyeballing a best-fit line from #num chunks vs. #length on a log-log plot.
     target_num_groups = max(1, int((len(text) ** 0.33) / 1.5))
   return group_by_embedding(text, chunks, target_num_groups, max_len)
+
+
+def clustering_spacy_chunker(
+  text: str, filter_short: int = 4, max_len: int = 512, target_num_groups: Optional[int] = None
+) -> list[TextChunk]:
+  """Split text into sentence-based chunks, with semantic clustering to join related sentences."""
+  chunks = simple_spacy_chunker(text, filter_short=filter_short)
+  return _cluster_sentence_chunks(text, chunks, max_len, target_num_groups)
+
+
+def clustering_spacy_batch_chunker(
+  texts: list[str],
+  filter_short: int = 4,
+  max_len: int = 512,
+  target_num_groups: Optional[int] = None,
+) -> list[list[TextChunk]]:
+  """Split a batch of texts like `clustering_spacy_chunker`, sentencizing them with `nlp.pipe`."""
+  sentencizer = get_spacy()
+  docs = sentencizer.pipe(texts, batch_size=SPACY_PIPE_BATCH_SIZE)
+  return [
+    _cluster_sentence_chunks(
+      text, _sentence_chunks(doc, text, filter_short), max_len, target_num_groups
+    )
+    for text, doc in zip(texts, docs)
+  ]
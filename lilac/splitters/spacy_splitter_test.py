@@ -1,6 +1,10 @@
 """Tests the spacy chunk splitter."""
 
-from .spacy_splitter import clustering_spacy_chunker, simple_spacy_chunker
+from .spacy_splitter import (
+  clustering_spacy_batch_chunker,
+  clustering_spacy_chunker,
+  simple_spacy_chunker,
+)
 from .text_splitter_test_utils import clean_textchunks, text_to_textchunk
 
 
@@ -55,3 +59,13 @@ def test_no_chunks_emitted() -> None:
   text = ''
   split_items = clustering_spacy_chunker(text, target_num_groups=4)
   assert split_items == []
+
+
+def test_batch_chunker() -> None:
+  texts = ['Blah1. Blah2. Blah2.', '', 'blah blah blah']
+  split_items = clustering_spacy_batch_chunker(texts, target_num_groups=2)
+  assert [clean_textchunks(items) for items in split_items] == [
+    text_to_textchunk(texts[0], ['Blah1.', 'Blah2. Blah2.']),
+    [],
+    text_to_textchunk(texts[2], ['blah blah blah']),
+  ]
@@ -1,7 +1,10 @@
 """Manage FastAPI background tasks."""
 
 import functools
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -43,6 +46,15 @@ class TaskType(str, Enum):
 
 TaskExecutionType = Literal['processes', 'threads']
 
+# The number of finished (completed or errored) tasks to remember. Older finished tasks are evicted
+# so a long-running server doesn't accumulate tasks forever. Pending tasks are never evicted.
+MAX_FINISHED_TASKS = 1024
+
+# Progress is reported to the task manager and the progress bar every N items, or when this much
+# time has passed since the last report, whichever comes first.
+PROGRESS_REPORT_EVERY = 1000
+PROGRESS_REPORT_INTERVAL_SECS = 0.2
+
 
 @dataclass
 class TaskInfo:
@@ -74,10 +86,18 @@ class TaskManager:
   """Manage FastAPI background tasks."""
 
   _tasks: dict[TaskId, TaskInfo]
+  _finished_task_ids: OrderedDict[TaskId, None]
 
   def __init__(self) -> None:
     # Maps a task id to the current progress of that task. Shared across all processes.
     self._tasks = {}
+    # The ids of finished tasks, ordered from least to most recently finished.
+    self._finished_task_ids = OrderedDict()
+    # The progress ratio of every task that reported progress and hasn't completed, so `manifest`
+    # doesn't have to scan all the tasks.
+    self._task_progress: dict[TaskId, float] = {}
+    # Guards the dicts above, which are updated from the threads running the tasks.
+    self._lock = threading.Lock()
 
   def get_task_info(self, task_id: TaskId) -> TaskInfo:
     """Get the task info for a task."""
@@ -85,15 +105,10 @@ class TaskManager:
 
   def manifest(self) -> TaskManifest:
     """Get all tasks."""
-    tasks_with_progress = [
-      (task.total_progress / task.total_len)
-      for task in self._tasks.values()
-      if task.total_progress and task.total_len and task.status != TaskStatus.COMPLETED
-    ]
-    return TaskManifest(
-      tasks=self._tasks,
-      progress=sum(tasks_with_progress) / len(tasks_with_progress) if tasks_with_progress else None,
-    )
+    with self._lock:
+      tasks = dict(self._tasks)
+      ratios = list(self._task_progress.values())
+    return TaskManifest(tasks=tasks, progress=sum(ratios) / len(ratios) if ratios else None)
 
   def task_id(
     self,
@@ -112,13 +127,15 @@ class TaskManager:
       start_timestamp=datetime.now().isoformat(),
       total_len=total_len,
     )
-    self._tasks[task_id] = new_task
+    with self._lock:
+      self._tasks[task_id] = new_task
     return task_id
 
   def report_task_progress(self, task_id: TaskId, progress: int) -> None:
     """Report the progress of a task."""
     task = self._tasks[task_id]
     task.total_progress = progress
+    self._update_task_progress(task_id)
 
   def set_task_error(self, task_id: TaskId, error: str) -> None:
     """Mark a task as errored."""
@@ -126,6 +143,7 @@ class TaskManager:
     task.status = TaskStatus.ERROR
     task.error = error
     task.end_timestamp = datetime.now().isoformat()
+    self._set_task_finished(task_id)
 
   def set_task_completed(self, task_id: TaskId) -> None:
     """Mark a task completed."""
@@ -139,6 +157,27 @@ class TaskManager:
     if task.status != TaskStatus.ERROR:
       task.status = TaskStatus.COMPLETED
       task.message = f'Completed in {elapsed_formatted}'
+    self._update_task_progress(task_id)
+    self._set_task_finished(task_id)
+
+  def _set_task_finished(self, task_id: TaskId) -> None:
+    """Record that a task finished, evicting the least recently finished tasks over the limit."""
+    with self._lock:
+      self._finished_task_ids[task_id] = None
+      self._finished_task_ids.move_to_end(task_id)
+      while len(self._finished_task_ids) > MAX_FINISHED_TASKS:
+        evicted_task_id, _ = self._finished_task_ids.popitem(last=False)
+        del self._tasks[evicted_task_id]
+        self._task_progress.pop(evicted_task_id, None)
+
+  def _update_task_progress(self, task_id: TaskId) -> None:
+    """Update the progress ratio of a task."""
+    with self._lock:
+      task = self._tasks.get(task_id)
+      if task and task.total_progress and task.total_len and task.status != TaskStatus.COMPLETED:
+        self._task_progress[task_id] = task.total_progress / task.total_len
+      else:
+        self._task_progress.pop(task_id, None)
 
 
 @functools.cache
@@ -172,14 +211,33 @@ def get_progress_bar(
 
   def progress_reporter(it: Iterator[TProgress]) -> Iterator[TProgress]:
     progress = offset
+    reported_progress = progress
+    last_report_time = time.monotonic()
+    progress_bar = tqdm(initial=progress, total=task_info.total_len, desc=task_info.description)
+
+    def _report() -> None:
+      nonlocal reported_progress, last_report_time
+      progress_bar.update(progress - reported_progress)
+      task_manager.report_task_progress(task_id, progress)
+      reported_progress = progress
+      last_report_time = time.monotonic()
+
     try:
-      for item in tqdm(it, initial=progress, total=task_info.total_len, desc=task_info.description):
+      for item in it:
         progress += 1
         yield item
-        task_manager.report_task_progress(task_id, progress)
+        if (
+          progress - reported_progress >= PROGRESS_REPORT_EVERY
+          or time.monotonic() - last_report_time >= PROGRESS_REPORT_INTERVAL_SECS
+        ):
+          _report()
+      # Flush the final progress.
+      _report()
     except Exception as e:
       task_manager.set_task_error(task_id, str(e))
       raise e
+    finally:
+      progress_bar.close()
     task_manager.set_task_completed(task_id)
 
   return progress_reporter
@@ -0,0 +1,74 @@
+"""Test tasks.py."""
+
+import os
+
+import pytest
+from pytest_mock import MockerFixture
+
+from . import tasks
+from .tasks import TaskManager, TaskStatus, get_progress_bar
+
+
+def test_finished_tasks_are_evicted(mocker: MockerFixture) -> None:
+  mocker.patch.object(tasks, 'MAX_FINISHED_TASKS', 2)
+  task_manager = TaskManager()
+
+  pending_id = task_manager.task_id('pending')
+  task_ids = [task_manager.task_id(f'task {i}') for i in range(3)]
+  task_manager.set_task_completed(task_ids[0])
+  task_manager.set_task_error(task_ids[1], 'error')
+  task_manager.set_task_completed(task_ids[2])
+
+  manifest = task_manager.manifest()
+  assert set(manifest.tasks.keys()) == {pending_id, task_ids[1], task_ids[2]}
+  assert manifest.tasks[pending_id].status == TaskStatus.PENDING
+  assert manifest.tasks[task_ids[1]].status == TaskStatus.ERROR
+
+  # The manifest holds a snapshot of the tasks, so later evictions don't change it.
+  task_manager.set_task_completed(pending_id)
+  assert set(manifest.tasks.keys()) == {pending_id, task_ids[1], task_ids[2]}
+  assert set(task_manager.manifest().tasks.keys()) == {task_ids[2], pending_id}
+
+
+def test_manifest_progress() -> None:
+  task_manager = TaskManager()
+  assert task_manager.manifest().progress is None
+
+  task_1 = task_manager.task_id('task 1', total_len=10)
+  task_2 = task_manager.task_id('task 2', total_len=4)
+  task_manager.report_task_progress(task_1, 5)
+  assert task_manager.manifest().progress == 0.5
+
+  task_manager.report_task_progress(task_2, 1)
+  assert task_manager.manifest().progress == pytest.approx((0.5 + 0.25) / 2)
+
+  task_manager.report_task_progress(task_1, 9)
+  assert task_manager.manifest().progress == pytest.approx((0.9 + 0.25) / 2)
+
+  task_manager.set_task_completed(task_1)
+  assert task_manager.manifest().progress == pytest.approx(0.25)
+
+  task_manager.set_task_completed(task_2)
+  assert task_manager.manifest().progress is None
+
+
+def test_progress_bar_reports_throttled_progress(mocker: MockerFixture) -> None:
+  mocker.patch.dict(os.environ, {'LILAC_TEST': ''})
+  mocker.patch.object(tasks, 'PROGRESS_REPORT_EVERY', 2)
+  mocker.patch.object(tasks, 'PROGRESS_REPORT_INTERVAL_SECS', float('inf'))
+  task_manager = TaskManager()
+  mocker.patch.object(tasks, 'get_task_manager', return_value=task_manager)
+  report_spy = mocker.spy(task_manager, 'report_task_progress')
+
+  task_id = task_manager.task_id('task')
+  progress_bar = get_progress_bar(task_id, estimated_len=5)
+  assert list(progress_bar(iter(range(5)))) == [0, 1, 2, 3, 4]
+
+  assert [call.args for call in report_spy.call_args_list] == [
+    (task_id, 2),
+    (task_id, 4),
+    (task_id, 5),
+  ]
+  task_info = task_manager.get_task_info(task_id)
+  assert task_info.total_progress == 5
+  assert task_info.status == TaskStatus.COMPLETED